@@ -2,14 +2,18 @@ from flask import Flask, render_template, jsonify, request
 import ee
 import json
 import logging
-from datetime import datetime
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from functools import wraps
-import geemap
-import geemap.foliumap as geemap
 import numpy as np
-import pandas as pd
-import joblib
+import hashlib
 import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from itertools import zip_longest as zip
 
 # Import konfigurasi dari file terpisah
@@ -23,11 +27,17 @@ logger = logging.getLogger(__name__)
 SCALE = config.SCALE
 MAX_TRAINING_POINTS = config.MAX_TRAINING_POINTS
 BANDS_SELECTED = ['VV_int', 'VH_int', 'RPI', 'API', 'NDPI', 'RVI', 'angle']
+STATS_TARGET_PIXELS = config.STATS_TARGET_PIXELS
+PARALLEL_SCALE = config.PARALLEL_SCALE
+TILE_SCALE = config.TILE_SCALE
+MAX_PARALLEL_REQUESTS = 8  # Batas thread untuk request EE yang dijalankan bersamaan
+RESULT_CACHE_SIZE = 32  # Jumlah maksimum entry cache klasifikasi/statistik (LRU)
 
 # Warna berdasarkan siklus pertumbuhan padi: vegetatif -> generatif
 # Hijau muda -> Hijau tua -> Kuning -> Coklat
 PALET_RICE_PHASES = ['#32CD32', '#FF1493', '#FF4500', '#4B0082']  # Light Green, Green, Gold, Brown
 RICE_PHASE_ORDER = ['vegetatif 1', 'vegetatif 2', 'generatif 1', 'generatif 2']  # Urutan siklus pertumbuhan
+PHASE_LABEL_CODES = {phase: i for i, phase in enumerate(RICE_PHASE_ORDER)}  # Label fase -> kode kelas numerik
 
 PALET = ['#00FFFF', '#FFD700', '#32CD32', '#FF1493', '#FF4500', '#4B0082', '#8B4513']  # untuk backward compatibility
 LABEL = ['Unknown', 'Air', 'Early Vegetatif', 'Vegetatif 1', 'Vegetatif 2', 'Generatif 1', 'Generatif 2', 'Bare']
@@ -38,10 +48,19 @@ MONTH_NAMES = [
     'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
 ]
 
+# Cache urutan fase/warna dan item legenda, dibangun sekali per model yang dimuat
+_ordered_rice_phases = None
+_phase_legend_items = None
+
 def get_ordered_rice_phases():
     """
     Mendapatkan mapping fase padi berdasarkan urutan pertumbuhan yang benar
     """
+    global _ordered_rice_phases
+
+    if _ordered_rice_phases is not None:
+        return _ordered_rice_phases
+
     model = load_trained_model()
     if model and hasattr(model, 'classes_'):
         model_classes = list(model.classes_)
@@ -68,11 +87,39 @@ def get_ordered_rice_phases():
                 else:
                     ordered_colors.append('#808080')  # Abu-abu untuk fase tidak dikenali
         
-        return ordered_phases, ordered_colors
+        _ordered_rice_phases = (ordered_phases, ordered_colors)
+        return _ordered_rice_phases
     else:
-        # Fallback jika model tidak tersedia
+        # Fallback jika model tidak tersedia (tidak di-cache agar dicoba lagi setelah model dimuat)
         return RICE_PHASE_ORDER, PALET_RICE_PHASES
 
+def get_phase_legend_items():
+    """Pasangan (nama fase, warna) untuk legenda, urut sesuai siklus pertumbuhan"""
+    global _phase_legend_items
+
+    if _phase_legend_items is None:
+        ordered_phases, ordered_colors = get_ordered_rice_phases()
+        legend_items = list(zip([phase.title() for phase in ordered_phases], ordered_colors))
+        if _ordered_rice_phases is None:
+            return legend_items
+        _phase_legend_items = legend_items
+
+    return _phase_legend_items
+
+def phase_labels_to_codes(labels, phases=RICE_PHASE_ORDER):
+    """
+    Konversi array label fase (string) ke kode kelas numerik (indeks di phases) secara vektor
+    dengan np.searchsorted. Label tidak dikenali -> 0, sama seperti konversi label di EE
+    """
+    phases = np.char.strip(np.char.lower(np.asarray(phases, dtype=str)))
+    labels = np.char.strip(np.char.lower(np.asarray(labels, dtype=str)))
+    
+    order = np.argsort(phases)
+    sorted_phases = phases[order]
+    idx = np.searchsorted(sorted_phases, labels).clip(0, len(sorted_phases) - 1)
+    
+    return np.where(sorted_phases[idx] == labels, order[idx], 0)
+
 def get_dasarian_info(dasarian):
     """Get month and period info for a dasarian"""
     month = ((dasarian - 1) // 3) + 1
@@ -90,7 +137,7 @@ def get_dasarian_info(dasarian):
 def date_to_dasarian(date_str):
     """Convert date string (YYYY-MM-DD) to dasarian"""
     try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
         month = date_obj.month
         day = date_obj.day
         
@@ -122,7 +169,7 @@ def dasarian_to_date_range(dasarian):
             start_day, end_day = 21, 31
             
         # Use current year (or you can make this configurable)
-        year = datetime.now().year
+        year = date.today().year
         
         start_date = f"{year}-{month:02d}-{start_day:02d}"
         end_date = f"{year}-{month:02d}-{end_day:02d}"
@@ -134,31 +181,243 @@ def dasarian_to_date_range(dasarian):
 # Global variable untuk menyimpan model yang sudah dimuat
 loaded_model = None
 
+# (mtime, size) file saat model dimuat dan hash isi file tersebut (key cache classifier),
+# selalu di-set bersamaan dengan loaded_model agar key tidak pernah lepas dari model di memori
+_loaded_model_stamp = None
+_loaded_model_key = None
+_model_lock = threading.RLock()
+
+# (mtime, size) file model yang terakhir gagal dimuat; load tidak dicoba lagi
+# (tanpa hash dan baca ulang file) sampai file model berubah lagi
+_failed_model_stamp = None
+
+# Berapa kali load diulang jika file model berubah saat sedang dibaca
+MODEL_LOAD_ATTEMPTS = 3
+
+# Cache informasi model, dibangun sekali per model yang dimuat
+_model_info = None
+
+# Format file model yang terdeteksi ('joblib' atau 'pickle') agar load berikutnya langsung ke cabang yang benar
+_model_format = None
+
+# File model di bawah ukuran ini dimuat tanpa mmap karena overhead mmap lebih besar dari manfaatnya
+MMAP_MIN_BYTES = 1 << 20
+
+# Ukuran buffer baca saat fallback ke pickle.load
+MODEL_READ_BUFFER_BYTES = 1 << 20
+
+# Kompresi default saat menyimpan model (zlib bawaan joblib, tanpa dependensi tambahan)
+MODEL_COMPRESSION = ('zlib', 3)
+
+# Magic bytes awal file joblib terkompresi, per kompresor joblib
+COMPRESSED_MODEL_MAGIC = {
+    'zlib': b'\x78',
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZ',
+    'xz': b'\xfd7zXZ',
+    'lzma': b'\x5d\x00',
+    'lz4': b'\x04\x22\x4d\x18',
+}
+
+# Error yang wajar saat membaca/unpickle file model: file rusak atau terpotong, format salah,
+# atau versi sklearn/joblib/numpy yang tidak cocok (modul/class tidak ditemukan).
+# Error lain (bug) tidak ditangkap agar tidak tersamarkan sebagai "model tidak tersedia"
+MODEL_LOAD_ERRORS = (
+    OSError, EOFError, pickle.UnpicklingError, ImportError,
+    AttributeError, ValueError, KeyError, IndexError
+)
+
+def detect_model_compression(model_path):
+    """Deteksi kompresi file model dari beberapa byte pertama; None jika tidak terkompresi"""
+    with open(model_path, 'rb') as f:
+        header = f.read(5)
+    
+    for compression, magic in COMPRESSED_MODEL_MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    
+    return None
+
+def save_trained_model(model, model_path=None, compress=MODEL_COMPRESSION):
+    """
+    Simpan model dengan joblib terkompresi (default zlib level 3, pickle protocol 5).
+    Format ini yang didukung read_model_file: lebih kecil di disk dan lebih cepat dibaca
+    karena array pohon yang berulang terkompresi dengan baik
+    """
+    import joblib
+    
+    model_path = model_path or config.MODEL_PATH
+    joblib.dump(model, model_path, compress=compress, protocol=pickle.HIGHEST_PROTOCOL)
+    logger.info(f"Model disimpan ke {model_path} (kompresi: {compress})")
+
+def read_model_file(model_path, file_size):
+    """
+    Membaca file model: joblib terlebih dahulu (mmap read-only untuk file besar
+    sehingga array pohon tidak disalin ke heap), fallback ke pickle.
+    File joblib terkompresi selalu dibaca dengan joblib tanpa mmap
+    """
+    global _model_format
+
+    compression = detect_model_compression(model_path)
+
+    if compression is not None or _model_format != 'pickle':
+        mmap_mode = 'r' if compression is None and file_size >= MMAP_MIN_BYTES else None
+        try:
+            import joblib
+            model = joblib.load(model_path, mmap_mode=mmap_mode)
+            _model_format = 'joblib' if compression is None else f'joblib-{compression}'
+            return model
+        except MODEL_LOAD_ERRORS as e:
+            # File terkompresi tidak bisa dibaca pickle, tidak ada gunanya fallback
+            if compression is not None:
+                raise
+            logger.warning(f"joblib.load gagal ({str(e)}), mencoba pickle.load")
+
+    # Buffer 1 MiB: parser pickle melakukan banyak read kecil, buffer default 8 KiB terlalu kecil
+    with open(model_path, 'rb', buffering=MODEL_READ_BUFFER_BYTES) as f:
+        model = pickle.load(f)
+    _model_format = 'pickle'
+    return model
+
+def get_model_file_stamp(model_path):
+    """(mtime_ns, size) file model, untuk mendeteksi file yang diganti"""
+    stat = os.stat(model_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def hash_model_file(model_path):
+    """Hash pendek isi file model dan BANDS_SELECTED"""
+    with open(model_path, 'rb') as f:
+        digest = hashlib.sha1(f.read())
+    digest.update(repr(BANDS_SELECTED).encode())
+    return digest.hexdigest()[:12]
+
 def load_trained_model():
     """Load model Random Forest yang sudah dilatih dengan joblib"""
-    global loaded_model
-    
-    if loaded_model is None:
+    return get_loaded_model_with_key()[0]
+
+def get_loaded_model_with_key():
+    """
+    Model yang dimuat beserta cache key-nya (hash file yang sama dengan yang dibaca saat load).
+    Jika file model diganti saat server berjalan (mtime/size berubah), model dimuat ulang
+    sehingga pohon classifier, cache, dan asset selalu memakai key dari model yang sama
+    """
+    global loaded_model, _loaded_model_stamp, _loaded_model_key, _failed_model_stamp
+    global _model_info, _ordered_rice_phases, _phase_legend_items
+
+    # config.py sudah menolak MODEL_PATH kosong, assert hanya mempersempit tipe ke str
+    model_path = config.MODEL_PATH
+    assert model_path is not None
+
+    with _model_lock:
         try:
-            if os.path.exists(config.MODEL_PATH):
-                loaded_model = joblib.load(config.MODEL_PATH)
-                logger.info(f"Model berhasil dimuat dari {config.MODEL_PATH}")
-                logger.info(f"Fitur yang digunakan: {loaded_model.feature_names_in_}")
-                logger.info(f"Jumlah kelas: {len(loaded_model.classes_)}")
-                logger.info(f"Kelas: {loaded_model.classes_}")
+            file_stamp = get_model_file_stamp(model_path)
+        except FileNotFoundError:
+            if loaded_model is None:
+                logger.error(f"File model tidak ditemukan: {model_path}")
+            # Model yang sudah dimuat tetap dipakai, key-nya tetap sesuai isi model tersebut
+            return loaded_model, _loaded_model_key
+
+        if loaded_model is not None and file_stamp == _loaded_model_stamp:
+            return loaded_model, _loaded_model_key
+
+        if file_stamp == _failed_model_stamp:
+            # File yang sama sudah gagal dimuat sebelumnya
+            return loaded_model, _loaded_model_key
+
+        if loaded_model is not None:
+            logger.info(f"File model {model_path} berubah, memuat ulang model")
+
+        try:
+            # Hash dan load harus melihat isi file yang sama: jika stamp berubah
+            # selama proses (file sedang ditulis), ulangi dari awal
+            for _ in range(MODEL_LOAD_ATTEMPTS):
+                model_key = hash_model_file(model_path)
+                model = read_model_file(model_path, file_stamp[1])
+                loaded_stamp, file_stamp = file_stamp, get_model_file_stamp(model_path)
+                if loaded_stamp == file_stamp:
+                    break
             else:
-                logger.error(f"File model tidak ditemukan: {config.MODEL_PATH}")
-                return None
-        except Exception as e:
+                raise OSError(f"File model {model_path} terus berubah selama dimuat")
+
+            logger.info(f"Model berhasil dimuat dari {model_path} (format: {_model_format}, key: {model_key})")
+            logger.info(f"Fitur yang digunakan: {get_model_feature_names(model)}")
+            validate_model_compatibility(model)
+            logger.info(f"Jumlah kelas: {len(model.classes_)}")
+            logger.info(f"Kelas: {model.classes_}")
+        except MODEL_LOAD_ERRORS as e:
+            # Model lama (jika ada) tetap dipakai bersama key-nya; load dicoba lagi setelah file berubah
             logger.error(f"Error loading model: {str(e)}")
-            return None
+            _failed_model_stamp = file_stamp
+            return loaded_model, _loaded_model_key
+
+        loaded_model, _loaded_model_stamp, _loaded_model_key = model, file_stamp, model_key
+        _failed_model_stamp = None
+        _model_info = None
+        _ordered_rice_phases = None
+        _phase_legend_items = None
+
+    return loaded_model, _loaded_model_key
+
+def get_model_feature_names(model):
+    """Nama fitur model; model yang dilatih tanpa nama kolom diasumsikan memakai urutan BANDS_SELECTED"""
+    if hasattr(model, 'feature_names_in_'):
+        return list(model.feature_names_in_)
+    return list(BANDS_SELECTED)
+
+def validate_model_compatibility(model):
+    """
+    Cek kecocokan fitur model dengan BANDS_SELECTED langsung dari atribut model,
+    tanpa membangun dict info model atau menyalin array fitur ke list
+    """
+    if hasattr(model, 'n_features_in_') and model.n_features_in_ != len(BANDS_SELECTED):
+        logger.warning(f"Model memakai {model.n_features_in_} fitur, BANDS_SELECTED berisi {len(BANDS_SELECTED)} band")
+        return False
     
-    return loaded_model
+    if hasattr(model, 'feature_names_in_') and set(model.feature_names_in_) != set(BANDS_SELECTED):
+        logger.warning(f"Fitur model {list(model.feature_names_in_)} tidak sama dengan BANDS_SELECTED {BANDS_SELECTED}")
+        return False
+    
+    return True
+
+def get_model_info():
+    """
+    Mendapatkan informasi model (fitur, kelas, parameter) yang di-cache
+    sehingga konversi array ke list tidak diulang setiap request
+    """
+    global _model_info
+
+    model = load_trained_model()
+    if model is None:
+        return None
+
+    if _model_info is None:
+        _model_info = {
+            'model_type': str(type(model).__name__),
+            'features': tuple(get_model_feature_names(model)),
+            'classes': tuple(model.classes_),
+            'n_estimators': model.n_estimators,
+            'max_depth': model.max_depth,
+            'min_samples_split': model.min_samples_split,
+            'min_samples_leaf': model.min_samples_leaf,
+            'model_path': config.MODEL_PATH,
+            'bands_used': BANDS_SELECTED
+        }
+
+    return _model_info
+
+# Geometry AOI yang sudah dibangun, dipakai ulang oleh semua klasifikasi dan statistik
+_indramayu_aoi = None
 
 def get_indramayu_aoi():
     """
     Mendefinisikan Area of Interest untuk Kabupaten Indramayu
+    Geometry dibangun sekali lalu dipakai ulang, sehingga setiap request mengirim subgraph AOI yang sama
     """
+    global _indramayu_aoi
+    
+    if _indramayu_aoi is not None:
+        return _indramayu_aoi
+    
     try:
         # Gunakan asset boundary Indramayu dari konfigurasi environment
         aoi_asset = ee.Image(config.INDRAMAYU_AOI_ASSET)
@@ -166,6 +425,7 @@ def get_indramayu_aoi():
         aoi_geometry = aoi_asset.geometry()
         
         logger.info("Indramayu AOI loaded from asset successfully")
+        _indramayu_aoi = aoi_geometry
         return aoi_geometry
         
     except Exception as e:
@@ -183,6 +443,42 @@ def get_indramayu_aoi():
         
         return ee.Geometry.Polygon(indramayu_coords)
 
+# Rectangle area studi untuk /api/analyze_phase, dibangun sekali seperti AOI di atas
+_analysis_rectangle = None
+
+def get_analysis_rectangle():
+    """Rectangle area studi (bounding box sekitar pusat peta) untuk analisis fase"""
+    global _analysis_rectangle
+    
+    if _analysis_rectangle is None:
+        _analysis_rectangle = ee.Geometry.Rectangle([108.1549, -6.5153, 108.5549, -6.1153])
+    
+    return _analysis_rectangle
+
+def median_composite(collection, parallel_scale=None):
+    """
+    Median composite dari collection dengan parallelScale, agar reducer dibagi ke lebih banyak
+    worker EE dan tidak kena "User memory limit exceeded". Nama band tetap sama seperti .median()
+    """
+    if parallel_scale is None:
+        parallel_scale = PARALLEL_SCALE
+    
+    return collection.reduce(ee.Reducer.median(), parallelScale=parallel_scale) \
+        .regexpRename('_median$', '')
+
+def _is_nonempty(collection):
+    """Cek collection tidak kosong tanpa menghitung seluruh isinya (maksimal satu image dievaluasi)"""
+    return collection.limit(1).toList(1).length().getInfo() > 0
+
+def get_sentinel1_collection(start_date, end_date, aoi):
+    """Koleksi Sentinel-1 GRD mode IW dengan polarisasi VV dan VH untuk rentang tanggal dan area"""
+    return ee.ImageCollection('COPERNICUS/S1_GRD') \
+        .filter(ee.Filter.eq('instrumentMode', 'IW')) \
+        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
+        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
+        .filterDate(start_date, end_date) \
+        .filterBounds(aoi)
+
 def check_sentinel1_availability(aoi):
     """
     Cek ketersediaan data Sentinel-1 di area tertentu
@@ -191,23 +487,23 @@ def check_sentinel1_availability(aoi):
         logger.info("Checking Sentinel-1 data availability...")
         
         # Check data availability for current year
-        current_year = datetime.now().year
+        current_year = date.today().year
         year_start = f"{current_year}-01-01"
         year_end = f"{current_year}-12-31"
         
-        s1_collection = ee.ImageCollection('COPERNICUS/S1_GRD') \
-            .filter(ee.Filter.eq('instrumentMode', 'IW')) \
-            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
-            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
-            .filterDate(year_start, year_end) \
-            .filterBounds(aoi)
+        s1_collection = get_sentinel1_collection(year_start, year_end, aoi)
+        
+        # Jumlah image dan beberapa tanggal sampel diambil dalam satu request
+        availability = ee.Dictionary({
+            'total': s1_collection.size(),
+            'sample_dates': s1_collection.limit(5).aggregate_array('system:time_start')
+        }).getInfo()
         
-        total_images = s1_collection.size().getInfo()
+        total_images = availability['total']
         logger.info(f"Total Sentinel-1 images available in {current_year}: {total_images}")
         
         if total_images > 0:
-            # Get some sample dates
-            sample_dates = s1_collection.limit(5).aggregate_array('system:time_start').getInfo()
+            sample_dates = availability['sample_dates']
             logger.info(f"Sample dates: {[datetime.fromtimestamp(d/1000).strftime('%Y-%m-%d') for d in sample_dates]}")
         
         return total_images > 0
@@ -223,86 +519,48 @@ def get_sentinel1_data_realtime(start_date, end_date, aoi):
     try:
         logger.info(f"Fetching real-time Sentinel-1 data from {start_date} to {end_date}")
         
-        # Coba filter dasar tanpa pembatasan orbit yang ketat
-        s1_collection = ee.ImageCollection('COPERNICUS/S1_GRD') \
-            .filter(ee.Filter.eq('instrumentMode', 'IW')) \
-            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
-            .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
-            .filterDate(start_date, end_date) \
-            .filterBounds(aoi)
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
+        current_year = date.today().year
+        year_start = f"{current_year}-01-01"
+        year_end = f"{current_year}-12-31"
         
-        collection_size = s1_collection.size().getInfo()
-        logger.info(f"Found {collection_size} Sentinel-1 images for initial search")
+        # Expand AOI slightly untuk pencarian tahunan
+        aoi_buffered = aoi.buffer(5000)  # 5km buffer
         
-        if collection_size == 0:
+        # Tahapan pencarian, berhenti di tahap pertama yang menemukan data:
+        # (deskripsi, tanggal mulai, tanggal akhir, area, batas jumlah image terbaru)
+        search_steps = [
+            # Coba filter dasar tanpa pembatasan orbit yang ketat
+            ("Initial search", start_date, end_date, aoi, None),
             # Extend date range by 2 months
-            from datetime import datetime, timedelta
-            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            
-            extended_start = (start_dt - timedelta(days=60)).strftime('%Y-%m-%d')
-            extended_end = (end_dt + timedelta(days=60)).strftime('%Y-%m-%d')
-            
-            logger.info(f"No data found, extending search to {extended_start} - {extended_end}")
+            ("Extended search",
+             (start_dt - timedelta(days=60)).isoformat(),
+             (end_dt + timedelta(days=60)).isoformat(),
+             aoi, None),
+            # Try with current year data and broader area, 50 most recent images
+            (f"Whole year {current_year} search with buffered AOI", year_start, year_end, aoi_buffered, 50),
+            # Last resort: try last 2 years without orbit restriction
+            ("Last resort search", f"{current_year - 1}-01-01", year_end, aoi_buffered, 20),
+        ]
+        
+        for description, search_start, search_end, search_aoi, limit in search_steps:
+            logger.info(f"{description}: {search_start} - {search_end}")
             
-            s1_collection = ee.ImageCollection('COPERNICUS/S1_GRD') \
-                .filter(ee.Filter.eq('instrumentMode', 'IW')) \
-                .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
-                .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
-                .filterDate(extended_start, extended_end) \
-                .filterBounds(aoi)
+            s1_collection = get_sentinel1_collection(search_start, search_end, search_aoi)
+            if limit:
+                s1_collection = s1_collection.sort('system:time_start', False).limit(limit)
             
-            collection_size = s1_collection.size().getInfo()
-            logger.info(f"Extended search found {collection_size} images")
+            # Hanya perlu tahu ada/tidaknya image, jumlah pastinya tidak dipakai
+            if _is_nonempty(s1_collection):
+                logger.info(f"Successfully found Sentinel-1 images in {description.lower()}")
+                break
             
-            if collection_size == 0:
-                # Try with current year data and broader area
-                current_year = datetime.now().year
-                year_start = f"{current_year}-01-01"
-                year_end = f"{current_year}-12-31"
-                
-                # Expand AOI slightly
-                aoi_buffered = aoi.buffer(5000)  # 5km buffer
-                
-                logger.info(f"Trying whole year {current_year} with buffered AOI")
-                
-                s1_collection = ee.ImageCollection('COPERNICUS/S1_GRD') \
-                    .filter(ee.Filter.eq('instrumentMode', 'IW')) \
-                    .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
-                    .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
-                    .filterDate(year_start, year_end) \
-                    .filterBounds(aoi_buffered) \
-                    .sort('system:time_start', False) \
-                    .limit(50)  # Get 50 most recent images
-                
-                collection_size = s1_collection.size().getInfo()
-                logger.info(f"Year search with buffer found {collection_size} images")
-                
-                if collection_size == 0:
-                    # Last resort: try last 2 years without orbit restriction
-                    past_year = current_year - 1
-                    past_start = f"{past_year}-01-01"
-                    
-                    logger.info(f"Last resort: searching from {past_start} to {year_end}")
-                    
-                    s1_collection = ee.ImageCollection('COPERNICUS/S1_GRD') \
-                        .filter(ee.Filter.eq('instrumentMode', 'IW')) \
-                        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VV')) \
-                        .filter(ee.Filter.listContains('transmitterReceiverPolarisation', 'VH')) \
-                        .filterDate(past_start, year_end) \
-                        .filterBounds(aoi_buffered) \
-                        .sort('system:time_start', False) \
-                        .limit(20)
-                    
-                    collection_size = s1_collection.size().getInfo()
-                    logger.info(f"Final search found {collection_size} images")
-        
-        if collection_size == 0:
+            logger.info(f"{description} found no images")
+        else:
             logger.warning("No Sentinel-1 data found even after exhaustive search")
             return None
         
-        logger.info(f"Successfully found {collection_size} Sentinel-1 images")
-        
         # Apply preprocessing pipeline
         processed_collection = s1_collection \
             .map(remove_border_noise) \
@@ -326,10 +584,9 @@ def remove_border_noise(img):
         # Only apply if VV band exists, otherwise return original
         cleaned_img = ee.Algorithms.If(
             has_vv,
-            # Apply border noise removal
-            ee.Image(img).updateMask(
-                img.mask().And(img.select('VV').gt(-35))
-            ).copyProperties(img, img.propertyNames()),
+            # Apply border noise removal (updateMask sudah menggabungkan dengan mask lama
+            # dan mempertahankan properties image)
+            img.updateMask(img.select('VV').gt(-35)),
             # Return original if no VV band
             img
         )
@@ -391,27 +648,31 @@ def calculate_vegetation_indices_s1(img):
         has_vv = band_names.contains('VV')
         has_vh = band_names.contains('VH')
         
+        # Kondisi dipakai oleh VV_int dan VH_int, dibangun sekali agar graph tidak berulang
+        has_linear = ee.Algorithms.And(has_vv_int, has_vh_int)
+        has_raw = ee.Algorithms.And(has_vv, has_vh)
+        
         # Gunakan kondisional EE tanpa .getInfo()
         vv_int = ee.Algorithms.If(
-            ee.Algorithms.And(has_vv_int, has_vh_int),
+            has_linear,
             # Gunakan data linear yang sudah ada
             img.select('VV_int').toFloat(),
             ee.Algorithms.If(
-                ee.Algorithms.And(has_vv, has_vh),
+                has_raw,
                 # Konversi dari dB ke linear untuk data mentah Sentinel-1
-                img.select('VV').toFloat().expression('10**(vv / 10)', {'vv': img.select('VV').toFloat()}).rename('VV_int').toFloat(),
+                img.expression('10**(vv / 10)', {'vv': img.select('VV').toFloat()}).rename('VV_int').toFloat(),
                 ee.Image.constant(0).rename('VV_int').toFloat()
             )
         )
         
         vh_int = ee.Algorithms.If(
-            ee.Algorithms.And(has_vv_int, has_vh_int),
+            has_linear,
             # Gunakan data linear yang sudah ada
             img.select('VH_int').toFloat(),
             ee.Algorithms.If(
-                ee.Algorithms.And(has_vv, has_vh),
+                has_raw,
                 # Konversi dari dB ke linear untuk data mentah Sentinel-1
-                img.select('VH').toFloat().expression('10**(vh / 10)', {'vh': img.select('VH').toFloat()}).rename('VH_int').toFloat(),
+                img.expression('10**(vh / 10)', {'vh': img.select('VH').toFloat()}).rename('VH_int').toFloat(),
                 ee.Image.constant(0).rename('VH_int').toFloat()
             )
         )
@@ -505,60 +766,261 @@ def calculate_vegetation_indices(image):
     
     return image.addBands([vv, vh, rpi, api, ndpi, rvi, angle])
 
+# Cache classifier EE yang sudah dibangun, di-key dengan hash isi file model + band
+_classifier_cache = {}
+
+def get_model_cache_key():
+    """
+    Hash pendek dari isi file model yang sedang dimuat dan BANDS_SELECTED untuk key cache classifier
+    (None jika model tidak tersedia)
+    """
+    return get_loaded_model_with_key()[1]
+
+def tree_to_ee_string(estimator, feature_names, class_codes):
+    """
+    Serialisasi satu DecisionTreeClassifier sklearn ke format teks decision tree EE
+    (format rpart: "n) fitur <= threshold n_samples impurity kelas", leaf ditandai "*")
+    """
+    # Salin array node ke list Python sekali per pohon (struktur SoA yang rata),
+    # sehingga loop di bawah tidak membuat skalar numpy per akses node
+    tree = estimator.tree_
+    children_left = tree.children_left.tolist()
+    children_right = tree.children_right.tolist()
+    n_samples = tree.n_node_samples.tolist()
+    impurity = tree.impurity.tolist()
+
+    # Kelas mayoritas setiap node, dipetakan ke kode kelas EE
+    node_values = class_codes[tree.value[:, 0, :].argmax(axis=1)].tolist()
+
+    # Nama fitur dan threshold split diformat sekali per node dan dipakai oleh kedua anaknya
+    split_features = [feature_names[f] if f >= 0 else '' for f in tree.feature.tolist()]
+    split_thresholds = [f"{t:.10f}" for t in tree.threshold.tolist()]
+
+    lines = [f"1) root {n_samples[0]} 9999 9999 ({impurity[0]:.4f})"]
+
+    # Traversal pre-order iteratif: (node sklearn, nomor node EE, kedalaman, tanda split, node parent)
+    stack = [(children_right[0], 3, 1, '>', 0), (children_left[0], 2, 1, '<=', 0)]
+    while stack:
+        node, number, depth, sign, parent = stack.pop()
+        is_leaf = children_left[node] == children_right[node]
+        lines.append(
+            f"{'  ' * depth}{number}) {split_features[parent]} {sign} {split_thresholds[parent]} "
+            f"{n_samples[node]} {impurity[node]:.4f} {node_values[node]}{' *' if is_leaf else ''}"
+        )
+        if not is_leaf:
+            stack.append((children_right[node], 2 * number + 1, depth + 1, '>', node))
+            stack.append((children_left[node], 2 * number, depth + 1, '<=', node))
+
+    return '\n'.join(lines)
+
+def get_tree_cache_path(cache_key):
+    """Path file cache string pohon EE, disimpan di samping file model"""
+    model_path = config.MODEL_PATH
+    assert model_path is not None  # sudah divalidasi di config.py
+    base_path, _ = os.path.splitext(model_path)
+    return f"{base_path}_ee_trees_{cache_key}.txt"
+
+def get_ee_tree_strings(model, cache_key):
+    """
+    Mendapatkan string pohon EE untuk seluruh estimator model
+    Hasil serialisasi di-cache ke disk sehingga forest tidak perlu ditelusuri ulang
+    """
+    cache_path = get_tree_cache_path(cache_key)
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            # Satu pohon per baris, newline dalam pohon dikodekan sebagai '#'
+            trees = [line.rstrip('\n').replace('#', '\n') for line in f if line.strip()]
+        if len(trees) == len(model.estimators_):
+            return trees
+        # File terpotong atau tidak cocok dengan model: serialisasi ulang dan timpa cache
+        logger.warning(f"Cache pohon EE {cache_path} berisi {len(trees)} dari {len(model.estimators_)} pohon, dibuat ulang")
+
+    ordered_phases, _ = get_ordered_rice_phases()
+    class_codes = phase_labels_to_codes(model.classes_, ordered_phases)
+    feature_names = get_model_feature_names(model)
+
+    trees = [tree_to_ee_string(estimator, feature_names, class_codes) for estimator in model.estimators_]
+
+    try:
+        # Tulis ke file sementara di direktori yang sama lalu os.replace, sehingga proses lain
+        # tidak pernah membaca cache yang baru separuh ditulis
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.writelines(tree.replace('\n', '#') + '\n' for tree in trees)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Tidak dapat menyimpan cache pohon EE ke {cache_path}: {str(e)}")
+
+    return trees
+
+# Asset id yang task export-nya sudah dimulai pada proses ini
+_exports_started = set()
+
+def load_asset_if_exists(asset_id, loader):
+    """
+    loader(asset_id) jika asset sudah ada di EE
+    Mengembalikan None jika asset_id kosong, asset belum ada, atau gagal dibaca
+    """
+    if not asset_id:
+        return None
+
+    try:
+        if ee.data.getInfo(asset_id) is None:
+            logger.info(f"Asset {asset_id} belum ada")
+            return None
+        logger.info(f"Loading asset {asset_id}")
+        return loader(asset_id)
+    except Exception as e:
+        logger.warning(f"Gagal load asset {asset_id}: {str(e)}")
+        return None
+
+def start_export_once(asset_id, make_task):
+    """
+    Mulai task export ke asset_id (make_task() membuat ee.batch.Task) agar proses berikutnya
+    cukup load dari asset. Task hanya dimulai sekali per asset per proses
+    """
+    if not asset_id or asset_id in _exports_started:
+        return
+
+    try:
+        task = make_task()
+        task.start()
+        _exports_started.add(asset_id)
+        logger.info(f"Started export to {asset_id} (task id: {task.id})")
+    except Exception as e:
+        logger.warning(f"Gagal memulai export ke {asset_id}: {str(e)}")
+
+def get_classifier_asset_id(cache_key):
+    """Asset id classifier EE untuk versi model tertentu (None jika CLASSIFIER_ASSET tidak diset)"""
+    if not config.CLASSIFIER_ASSET:
+        return None
+    return f"{config.CLASSIFIER_ASSET}_{cache_key}"
+
+def load_classifier_asset(cache_key):
+    """Classifier yang sudah diekspor ke asset EE (ee.Classifier.load), None jika belum ada"""
+    return load_asset_if_exists(get_classifier_asset_id(cache_key), ee.Classifier.load)
+
+def export_classifier_asset(classifier, cache_key):
+    """Mulai Export.classifier.toAsset untuk classifier versi model ini"""
+    asset_id = get_classifier_asset_id(cache_key)
+    start_export_once(asset_id, lambda: ee.batch.Export.classifier.toAsset(
+        classifier=classifier,
+        description=f"rf_classifier_{cache_key}",
+        assetId=asset_id
+    ))
+
 def create_classifier_from_trained_model():
     """
     Membuat classifier EE dari model yang sudah dilatih
-    Menggunakan pendekatan hybrid: train EE classifier dengan parameter yang mirip
+    Pohon Random Forest sklearn dikonversi langsung ke ee.Classifier.decisionTreeEnsemble,
+    training ulang di EE hanya dipakai sebagai fallback jika konversi gagal.
+    Classifier di-cache per isi file model sehingga tidak dibangun ulang setiap request.
+    Jika CLASSIFIER_ASSET diset, classifier diambil dari asset EE dan baru dibangun
+    (lalu diekspor ke asset) saat asset untuk versi model ini belum ada
     """
-    model = load_trained_model()
+    return get_classifier_with_key()[0]
+
+def get_classifier_with_key():
+    """Classifier EE beserta cache key model yang dipakai untuk membangunnya"""
+    model, cache_key = get_loaded_model_with_key()
     if model is None:
-        return None
+        return None, None
+
+    if not config.FORCE_RETRAIN and cache_key in _classifier_cache:
+        return _classifier_cache[cache_key], cache_key
+
+    clear_classification_cache()
+    classifier = None if config.FORCE_RETRAIN else load_classifier_asset(cache_key)
+
+    if classifier is None:
+        logger.info(f"Building EE classifier (cache key: {cache_key})")
+        try:
+            trees = get_ee_tree_strings(model, cache_key)
+            classifier = ee.Classifier.decisionTreeEnsemble(trees)
+            # decisionTreeEnsemble hanya membangun graph di klien; explain() memaksa EE mem-parse
+            # string pohon sekali saat classifier dibangun, sebelum dipakai dan diekspor ke asset
+            classifier.explain().getInfo()
+            logger.info(f"Converted {len(trees)} sklearn trees to EE decisionTreeEnsemble")
+        except (AttributeError, TypeError, ValueError, IndexError, ee.EEException) as e:
+            # Model bukan ensemble pohon sklearn atau EE menolak string pohon
+            logger.warning(f"Konversi model ke decisionTreeEnsemble gagal ({str(e)}), fallback ke training EE")
+            classifier = train_ee_classifier(model)
+
+        if classifier is not None:
+            export_classifier_asset(classifier, cache_key)
+
+    if classifier is not None:
+        _classifier_cache[cache_key] = classifier
+
+    return classifier, cache_key
+
+def sample_training_data():
+    """
+    Ambil sampel band BANDS_SELECTED di titik pelatihan (property FaseNumerik sebagai label)
+    """
+    # Load training data dari konfigurasi environment
+    titik_pelatihan = ee.FeatureCollection(config.TRAINING_POINTS_ASSET)
+    koleksi_pelatihan = ee.ImageCollection(config.COLLECTION_ASSET)
+    
+    # Limit training points
+    titik_pelatihan_limit = titik_pelatihan.limit(MAX_TRAINING_POINTS)
+    
+    # Konversi fase ke numerik sesuai dengan urutan yang benar (0-3 untuk 4 kelas)
+    # Satu lookup ee.Dictionary per feature, fase tidak dikenali -> 0
+    label_map = ee.Dictionary(PHASE_LABEL_CODES)
+
+    def konversi_label_numerik(feature):
+        fase_string = ee.String(feature.get('Fase')).toLowerCase().trim()
+        return feature.set('FaseNumerik', ee.Number(label_map.get(fase_string, 0)))
+    
+    titik_pelatihan_numerik = titik_pelatihan_limit.map(konversi_label_numerik)
     
+    # Prepare training image - gunakan langsung tanpa map calculate_vegetation_indices
+    # karena collection sudah memiliki band yang diperlukan.
+    # Sampling dilakukan sekali pada satu citra (tanpa map/flatten per image)
+    first_image = ee.Image(koleksi_pelatihan.first()).select(BANDS_SELECTED)
+    
+    # Mask pixel yang kosong di salah satu band sebelum sampling, sehingga baris null
+    # tidak pernah dibuat (FaseNumerik selalu terisi dari lookup label dengan default 0)
+    valid_mask = first_image.mask().reduce(ee.Reducer.min())
+    
+    # Sample regions directly
+    data_latih = first_image.updateMask(valid_mask).sampleRegions(
+        collection=titik_pelatihan_numerik,
+        properties=['FaseNumerik'],
+        scale=SCALE,
+        geometries=False,
+        tileScale=TILE_SCALE  # tile lebih kecil agar sampling tidak kena batas memori worker
+    )
+    
+    return data_latih
+
+def load_training_samples_asset():
+    """Sampel pelatihan dari TRAINING_SAMPLES_ASSET (hasil Export.table.toAsset), None jika belum ada"""
+    return load_asset_if_exists(config.TRAINING_SAMPLES_ASSET, ee.FeatureCollection)
+
+def export_training_samples_asset(data_latih):
+    """Mulai Export.table.toAsset untuk sampel pelatihan agar training berikutnya tidak sampling ulang"""
+    asset_id = config.TRAINING_SAMPLES_ASSET
+    start_export_once(asset_id, lambda: ee.batch.Export.table.toAsset(
+        collection=data_latih,
+        description='rf_training_samples',
+        assetId=asset_id
+    ))
+
+def train_ee_classifier(model):
+    """
+    Train classifier smileRandomForest di EE dengan parameter yang mirip dengan model yang sudah dilatih
+    """
     try:
-        # Load training data dari konfigurasi environment
-        titik_pelatihan = ee.FeatureCollection(config.TRAINING_POINTS_ASSET)
-        koleksi_pelatihan = ee.ImageCollection(config.COLLECTION_ASSET)
-        
-        # Limit training points
-        titik_pelatihan_limit = titik_pelatihan.limit(MAX_TRAINING_POINTS)
-        
-        # Konversi fase ke numerik sesuai dengan urutan yang benar
-        def konversi_label_numerik(feature):
-            fase_string = ee.String(feature.get('Fase')).toLowerCase().trim()
-            
-            # Map fase ke angka berdasarkan RICE_PHASE_ORDER (0-3 untuk 4 kelas)
-            fase_numerik = ee.Algorithms.If(
-                fase_string.equals('vegetatif 1'), 0,  # vegetatif 1 -> 0 (hijau muda)
-                ee.Algorithms.If(
-                    fase_string.equals('vegetatif 2'), 1,  # vegetatif 2 -> 1 (hijau tua)
-                    ee.Algorithms.If(
-                        fase_string.equals('generatif 1'), 2,  # generatif 1 -> 2 (kuning)
-                        ee.Algorithms.If(
-                            fase_string.equals('generatif 2'), 3,  # generatif 2 -> 3 (coklat)
-                            # Default untuk fase lain yang tidak dikenali
-                            0
-                        )
-                    )
-                )
-            )
-            return feature.set('FaseNumerik', fase_numerik)
-        
-        titik_pelatihan_numerik = titik_pelatihan_limit.map(konversi_label_numerik)
-        
-        # Prepare training collection - gunakan langsung tanpa map calculate_vegetation_indices
-        # karena collection sudah memiliki band yang diperlukan
-        koleksi_latih = koleksi_pelatihan.limit(20)
-        
-        # Extract features from a single image
-        first_image = ee.Image(koleksi_latih.first()).select(BANDS_SELECTED)
-        
-        # Sample regions directly
-        data_latih = first_image.sampleRegions(
-            collection=titik_pelatihan_numerik,
-            properties=['FaseNumerik'],
-            scale=SCALE,
-            geometries=False
-        ).filter(ee.Filter.notNull(BANDS_SELECTED + ['FaseNumerik']))
+        data_latih = load_training_samples_asset()
+        if data_latih is None:
+            data_latih = sample_training_data()
+            export_training_samples_asset(data_latih)
         
         # Split data
         data_acak = data_latih.randomColumn('random', 42)
@@ -584,12 +1046,125 @@ def create_classifier_from_trained_model():
         logger.error(f"Error creating classifier: {str(e)}")
         return None
 
+class LRUCache:
+    """Cache dict berukuran tetap; entry yang paling lama tidak dipakai dibuang lebih dulu"""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()  # dipakai bersama oleh thread compare_periods
+
+    def get(self, key, max_age=None):
+        """Nilai untuk key, atau None jika tidak ada / lebih tua dari max_age detik"""
+        with self._lock:
+            if key not in self._data:
+                return None
+            stored_at, value = self._data[key]
+            if max_age is not None and time.monotonic() - stored_at >= max_age:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+# Cache image hasil klasifikasi per (periode, cache key model) dan statistik area per image,
+# sehingga request berulang untuk periode yang sama tidak membangun ulang graph EE
+_classification_cache = LRUCache()
+_stats_cache = LRUCache()
+# Klasifikasi real-time bergantung pada pencarian scene Sentinel-1 (getInfo) yang bisa berubah
+# saat scene baru masuk, jadi entry 'date' dibangun ulang setelah TTL ini
+REALTIME_CLASSIFICATION_TTL_SECONDS = 300
+
+def clear_classification_cache():
+    """Kosongkan cache klasifikasi dan statistik (dipanggil saat classifier dibangun ulang)"""
+    _classification_cache.clear()
+    _stats_cache.clear()
+
+# Index dasarian yang sudah tersedia di CLASSIFIED_COLLECTION_ASSET, per cache key model:
+# model_key -> (waktu dibaca, set index). Export berjalan di proses lain (flask export-classified),
+# jadi hasil dibaca ulang setelah TTL agar image yang baru selesai diekspor ikut terpakai
+_classified_asset_indices = {}
+CLASSIFIED_ASSET_TTL_SECONDS = 300
+
+def get_classified_asset_indices(model_key):
+    """Set index dasarian (1-based) yang sudah diekspor untuk versi model ini"""
+    if not config.CLASSIFIED_COLLECTION_ASSET:
+        return set()
+
+    cached = _classified_asset_indices.get(model_key)
+    if cached is not None and time.monotonic() - cached[0] < CLASSIFIED_ASSET_TTL_SECONDS:
+        return cached[1]
+
+    try:
+        indices = set(ee.ImageCollection(config.CLASSIFIED_COLLECTION_ASSET)
+                      .filter(ee.Filter.eq('model_cache_key', model_key))
+                      .aggregate_array('dasarian_index')
+                      .getInfo())
+    except Exception as e:
+        # Tidak di-cache: asset mungkin belum dibuat, dicoba lagi pada request berikutnya
+        logger.warning(f"Classified collection asset tidak bisa dibaca: {str(e)}")
+        return set()
+
+    logger.info(f"Classified asset has {len(indices)} dasarian for model {model_key}")
+    if indices:
+        _classified_asset_indices[model_key] = (time.monotonic(), indices)
+    else:
+        # Hasil kosong tidak di-cache agar export yang baru selesai langsung terlihat
+        _classified_asset_indices.pop(model_key, None)
+
+    return indices
+
+def get_exported_classification(dasarian):
+    """
+    Image klasifikasi dasarian dari CLASSIFIED_COLLECTION_ASSET (hasil export-classified)
+    Mengembalikan None jika asset tidak dikonfigurasi atau dasarian belum diekspor untuk model ini
+    """
+    if not config.CLASSIFIED_COLLECTION_ASSET:
+        return None
+
+    model_key = get_model_cache_key()
+    if model_key is None:
+        return None
+
+    if dasarian not in get_classified_asset_indices(model_key):
+        return None
+
+    exported = ee.ImageCollection(config.CLASSIFIED_COLLECTION_ASSET) \
+        .filter(ee.Filter.eq('model_cache_key', model_key)) \
+        .filter(ee.Filter.eq('dasarian_index', dasarian)) \
+        .first()
+    return ee.Image(exported).select('classification')
+
 def classify_with_dasarian_filter_asset(dasarian_start=1, dasarian_end=36):
     """
     Klasifikasi menggunakan collection yang sudah ada di asset berdasarkan dasarian
     Menggunakan collection yang sudah dipreprocessing tanpa perubahan
     """
+    cache_key = ('dasarian', dasarian_start, dasarian_end, get_model_cache_key())
+    cached = _classification_cache.get(cache_key)
+    if not config.FORCE_RETRAIN and cached is not None:
+        logger.info(f"Using cached asset classification for dasarian {dasarian_start} to {dasarian_end}")
+        return cached
+
     try:
+        # Dasarian tunggal yang sudah diekspor tidak perlu diklasifikasi ulang
+        if dasarian_start == dasarian_end and not config.FORCE_RETRAIN:
+            exported = get_exported_classification(dasarian_start)
+            if exported is not None:
+                logger.info(f"Using exported classification asset for dasarian {dasarian_start}")
+                _classification_cache[cache_key] = exported
+                return exported
+        
         logger.info(f"Classifying using ASSET collection for dasarian {dasarian_start} to {dasarian_end}")
         
         # Load classifier
@@ -621,7 +1196,7 @@ def classify_with_dasarian_filter_asset(dasarian_start=1, dasarian_end=36):
                 # Ambil subset collection
                 subset_list = collection.toList(total_images).slice(start_idx, end_idx + 1)
                 subset_collection = ee.ImageCollection.fromImages(subset_list)
-                target_image = subset_collection.median()
+                target_image = median_composite(subset_collection)
             else:
                 # Fallback ke single image
                 collection_list = collection.toList(collection.size())
@@ -629,18 +1204,12 @@ def classify_with_dasarian_filter_asset(dasarian_start=1, dasarian_end=36):
                 target_image = ee.Image(collection_list.get(image_index))
         
         # Perform classification - pastikan band yang digunakan tersedia
-        classified = target_image.select(BANDS_SELECTED).classify(classifier).rename('classification')
-        
-        # Set metadata
-        dasarian_info = get_dasarian_info(dasarian_start)
-        classified = classified.set({
-            'dasarian': dasarian_start,
-            'month_name': dasarian_info['month_name'],
-            'display_name': dasarian_info['display_name'],
-            'data_source': 'asset_collection'
-        })
+        # (band output classify() sudah bernama 'classification'; metadata periode tidak dibaca di server
+        # sehingga tidak di-set ke image agar graph tetap ringkas)
+        classified = target_image.select(BANDS_SELECTED).classify(classifier)
         
         logger.info(f"Asset classification completed for dasarian {dasarian_start}")
+        _classification_cache[cache_key] = classified
         return classified
         
     except Exception as e:
@@ -651,21 +1220,22 @@ def classify_with_date_filter_realtime(start_date, end_date):
     """
     Klasifikasi menggunakan data Sentinel-1 real-time berdasarkan tanggal
     """
+    cache_key = ('date', start_date, end_date, get_model_cache_key())
+    cached = _classification_cache.get(cache_key, max_age=REALTIME_CLASSIFICATION_TTL_SECONDS)
+    if not config.FORCE_RETRAIN and cached is not None:
+        logger.info(f"Using cached real-time classification for {start_date} to {end_date}")
+        return cached
+
     try:
         logger.info(f"Classifying using REAL-TIME Sentinel-1 data for {start_date} to {end_date}")
         
         # Get AOI Indramayu
         aoi = get_indramayu_aoi()
         
-        # Check data availability first
-        if not check_sentinel1_availability(aoi):
-            logger.warning("No Sentinel-1 data available in the area")
-            return None
-        
-        # Get real-time Sentinel-1 data
+        # Get real-time Sentinel-1 data (None jika pencarian bertahap tidak menemukan image)
         s1_data = get_sentinel1_data_realtime(start_date, end_date, aoi)
         
-        if s1_data is None or s1_data.size().getInfo() == 0:
+        if s1_data is None:
             logger.warning(f"No Sentinel-1 data found for {start_date} to {end_date}")
             return None
         
@@ -676,34 +1246,56 @@ def classify_with_date_filter_realtime(start_date, end_date):
             return None
         
         # Get median composite from the filtered collection
-        composite_image = s1_data.median()
+        composite_image = median_composite(s1_data)
         
-        # Perform classification
-        classified = composite_image.select(BANDS_SELECTED).classify(classifier).rename('classification')
-        
-        # Set metadata
-        classified = classified.set({
-            'start_date': start_date,
-            'end_date': end_date,
-            'data_source': 'Sentinel-1_realtime'
-        })
+        # Perform classification (band output classify() sudah bernama 'classification')
+        classified = composite_image.select(BANDS_SELECTED).classify(classifier)
         
         logger.info(f"Real-time classification completed for period {start_date} - {end_date}")
+        _classification_cache[cache_key] = classified
         return classified
         
     except Exception as e:
         logger.error(f"Error in real-time date classification: {str(e)}")
         return None
 
-def calculate_area_statistics(classified_image, scale=SCALE):
+# Luas region (m²) per nama region, diambil sekali dari EE untuk menentukan skala statistik
+_region_area_cache = {}
+
+def get_adaptive_scale(region, region_key):
+    """
+    Skala reduceRegion yang dinaikkan dari SCALE seperlunya sehingga jumlah pixel
+    di region tidak melebihi STATS_TARGET_PIXELS
+    """
+    if region_key not in _region_area_cache:
+        _region_area_cache[region_key] = region.area(maxError=1).getInfo()
+    
+    area = _region_area_cache[region_key]
+    return max(SCALE, math.ceil(math.sqrt(area / STATS_TARGET_PIXELS)))
+
+def calculate_area_statistics(classified_image, scale=None, tile_scale=None):
     """
     Menghitung statistik area untuk setiap kelas dalam hektar dengan persentase
+    Jika scale tidak diberikan, skala dipilih otomatis dari luas AOI (lihat get_adaptive_scale).
+    tile_scale (default TILE_SCALE) memperkecil tile reduceRegion agar tidak kehabisan memori.
+    Hasil di-cache berdasarkan graph image yang diserialisasi dan skala
     """
+    if tile_scale is None:
+        tile_scale = TILE_SCALE
+    
     try:
-        logger.info("Starting area statistics calculation...")
-        
         # Gunakan AOI Indramayu
         study_area = get_indramayu_aoi()
+        if scale is None:
+            scale = get_adaptive_scale(study_area, 'indramayu_aoi')
+        
+        cache_key = (hashlib.sha1(classified_image.serialize().encode()).hexdigest(), scale)
+        cached = _stats_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached area statistics")
+            return cached
+        
+        logger.info(f"Starting area statistics calculation (scale: {scale} m)...")
         
         # Hitung area untuk setiap kelas
         # Konversi pixel ke area dalam meter persegi, kemudian ke hektar
@@ -715,7 +1307,8 @@ def calculate_area_statistics(classified_image, scale=SCALE):
             reducer=ee.Reducer.histogram(),
             geometry=study_area,
             scale=scale,
-            maxPixels=1e9
+            maxPixels=1e9,
+            tileScale=tile_scale
         ).getInfo()
         
         logger.info(f"Histogram result: {histogram}")
@@ -797,6 +1390,7 @@ def calculate_area_statistics(classified_image, scale=SCALE):
         for dist in summary_stats['class_distribution']:
             logger.info(f"  - {dist['class_name']}: {dist['percentage']:.2f}% ({dist['area_hectares']:.2f} ha)")
         
+        _stats_cache[cache_key] = summary_stats
         return summary_stats
         
     except Exception as e:
@@ -805,7 +1399,11 @@ def calculate_area_statistics(classified_image, scale=SCALE):
 
 # Visualization parameters for rice phase classification
 def get_phase_vis_params():
-    """Get visualization parameters based on actual model classes with proper rice phase colors"""
+    """
+    Get visualization parameters based on actual model classes with proper rice phase colors
+    Dipanggil saat dibutuhkan (bukan saat import) agar model tidak dimuat sebelum startup
+    dan parameter selalu mengikuti model yang sedang dimuat
+    """
     ordered_phases, ordered_colors = get_ordered_rice_phases()
     n_classes = len(ordered_phases)
     
@@ -815,10 +1413,11 @@ def get_phase_vis_params():
         'palette': ordered_colors
     }
 
-phase_vis_params = get_phase_vis_params()
-
 def create_map(with_classification=False, dasarian_filter=None, start_date=None, end_date=None):
     """Create a base map using geemap with optional rice phase classification"""
+    # geemap (folium, ipyleaflet, dll.) diimpor saat peta pertama dibuat agar startup aplikasi cepat
+    import geemap.foliumap as geemap
+
     center_lat, center_lon = -6.3153, 108.3549
     
     # Create a geemap Map object
@@ -866,14 +1465,14 @@ def create_map(with_classification=False, dasarian_filter=None, start_date=None,
                 # Add classification layer
                 my_map.addLayer(
                     classified_image,
-                    phase_vis_params,
+                    get_phase_vis_params(),
                     layer_name
                 )
                 
                 # Add legend berdasarkan urutan fase pertumbuhan yang benar
-                ordered_phases, ordered_colors = get_ordered_rice_phases()
-                legend_dict = dict(zip([phase.title() for phase in ordered_phases], ordered_colors))
-                legend_title = f"Fase Padi ({len(ordered_phases)} kelas) - Urutan Pertumbuhan"
+                legend_items = get_phase_legend_items()
+                legend_dict = dict(legend_items)
+                legend_title = f"Fase Padi ({len(legend_items)} kelas) - Urutan Pertumbuhan"
                 
                 my_map.add_legend(
                     title=legend_title,
@@ -905,24 +1504,37 @@ def handle_ee_errors(f):
 app = Flask(__name__)
 
 # Earth Engine Initialization menggunakan konfigurasi dari environment
-try:
-    logger.info(f"Initializing Earth Engine with project: {config.GEE_PROJECT_ID}")
-    ee.Initialize(project=config.GEE_PROJECT_ID)
-    logger.info("Earth Engine initialized successfully")
-except Exception as e:
-    logger.warning(f"Failed to initialize with project {config.GEE_PROJECT_ID}: {str(e)}")
-    logger.info("Attempting authentication and re-initialization...")
+# Endpoint high-volume (opt-in lewat GEE_HIGH_VOLUME) untuk deployment dengan banyak request
+# paralel; endpoint ini tidak melakukan caching, sehingga default tetap endpoint standar
+EE_HIGH_VOLUME_URL = 'https://earthengine-highvolume.googleapis.com'
+ee_init_kwargs = {'project': config.GEE_PROJECT_ID}
+if config.GEE_HIGH_VOLUME:
+    ee_init_kwargs['opt_url'] = EE_HIGH_VOLUME_URL
+
+def initialize_earth_engine():
+    """Inisialisasi Earth Engine, dengan fallback autentikasi jika inisialisasi pertama gagal"""
     try:
-        ee.Authenticate()
-        ee.Initialize(project=config.GEE_PROJECT_ID)
-        logger.info("Earth Engine authenticated and initialized successfully")
-    except Exception as auth_error:
-        logger.error(f"Failed to authenticate and initialize Earth Engine: {str(auth_error)}")
-        raise
+        logger.info(f"Initializing Earth Engine with project: {config.GEE_PROJECT_ID} (high-volume: {config.GEE_HIGH_VOLUME})")
+        ee.Initialize(**ee_init_kwargs)
+        logger.info("Earth Engine initialized successfully")
+    except Exception as e:
+        logger.warning(f"Failed to initialize with project {config.GEE_PROJECT_ID}: {str(e)}")
+        logger.info("Attempting authentication and re-initialization...")
+        try:
+            ee.Authenticate()
+            ee.Initialize(**ee_init_kwargs)
+            logger.info("Earth Engine authenticated and initialized successfully")
+        except Exception as auth_error:
+            logger.error(f"Failed to authenticate and initialize Earth Engine: {str(auth_error)}")
+            raise
 
-# Load model saat startup
-logger.info("Loading trained model at startup...")
-load_trained_model()
+# Load model saat startup, bersamaan dengan inisialisasi EE:
+# membaca/unpickle model hanya I/O lokal dan tidak membutuhkan EE
+with ThreadPoolExecutor(max_workers=1) as startup_executor:
+    logger.info("Loading trained model at startup...")
+    model_future = startup_executor.submit(load_trained_model)
+    initialize_earth_engine()
+    model_future.result()
 
 # Route utama
 @app.route('/')
@@ -933,7 +1545,7 @@ def home():
         collection_with_indices = collection.map(calculate_vegetation_indices)
         
         # Buat mosaic dari seluruh koleksi
-        initial_mosaic = collection_with_indices.median()
+        initial_mosaic = median_composite(collection_with_indices)
         
         # Parameter visualisasi
         vis_params = {
@@ -990,18 +1602,10 @@ def rice_phase_view():
         map_html = my_map._repr_html_()
         
         # Get model info for template
-        model = load_trained_model()
-        model_info = {}
-        if model:
-            model_info = {
-                'features': list(model.feature_names_in_),
-                'classes': list(model.classes_),
-                'n_estimators': model.n_estimators
-            }
+        model_info = get_model_info() or {}
         
         # Create a list of zipped labels and colors berdasarkan urutan pertumbuhan yang benar
-        ordered_phases, ordered_colors = get_ordered_rice_phases()
-        zipped_data = list(zip([phase.title() for phase in ordered_phases], ordered_colors))
+        zipped_data = get_phase_legend_items()
         
         # Generate dasarian options with month names
         dasarian_options = []
@@ -1022,6 +1626,32 @@ def rice_phase_view():
         logger.error(f"Error in rice phase view: {str(e)}")
         return f"Error: {str(e)}", 500
 
+def render_map_with_stats(classified_image, compute_stats, **map_kwargs):
+    """
+    HTML peta klasifikasi (create_map dengan map_kwargs) dan statistik area classified_image.
+    Statistik (getInfo) dan tile peta (getMapId) sama-sama menunggu EE, jadi dijalankan paralel.
+    Mengembalikan (map_html, area_stats); area_stats None jika compute_stats False atau gagal
+    """
+    area_stats = None
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        stats_future = None
+        if compute_stats:
+            stats_future = executor.submit(calculate_area_statistics, classified_image)
+        
+        my_map = create_map(with_classification=True, **map_kwargs)
+        map_html = my_map._repr_html_()
+        
+        if stats_future is not None:
+            try:
+                area_stats = stats_future.result()
+                if area_stats:
+                    logger.info("Area statistics calculated successfully")
+            except Exception as stats_error:
+                logger.warning(f"Could not calculate area stats: {str(stats_error)}")
+    
+    return map_html, area_stats
+
 @app.route('/api/classify-by-date', methods=['POST'])
 @handle_ee_errors
 def classify_by_date():
@@ -1067,24 +1697,19 @@ def classify_by_date():
             if classified_image is None:
                 return jsonify({'error': 'Tidak ada data Sentinel-1 untuk periode tersebut'}), 404
             
-            # Calculate area statistics for default collection
-            area_stats = None
-            try:
-                area_stats = calculate_area_statistics(classified_image)
-            except Exception as stats_error:
-                logger.warning(f"Could not compute area stats: {str(stats_error)}")
-                
+            area_stats = None  # dihitung bersamaan dengan pembuatan peta di bawah
             data_source = 'Sentinel-1 Real-time'
         
-        # Create map with classification
-        my_map = create_map(
-            with_classification=True,
+        # Create map with classification; area statistics untuk default collection
+        # dihitung bersamaan dengan pembuatan peta
+        map_html, default_area_stats = render_map_with_stats(
+            classified_image,
+            compute_stats=source_type != 'custom',
             start_date=start_date,
             end_date=end_date
         )
-        
-        # Convert to HTML
-        map_html = my_map._repr_html_()
+        if source_type != 'custom':
+            area_stats = default_area_stats
         
         return jsonify({
             'success': True,
@@ -1158,26 +1783,18 @@ def get_classification_map_dasarian():
             if classified_image is None:
                 return jsonify({'error': 'Gagal klasifikasi dasarian'}), 500
                 
-            # Calculate area statistics for default collection
-            area_stats = None
-            try:
-                area_stats = calculate_area_statistics(classified_image)
-                if area_stats:
-                    logger.info("Area statistics calculated successfully")
-            except Exception as stats_error:
-                logger.warning(f"Could not calculate area stats: {str(stats_error)}")
-                
+            area_stats = None  # dihitung bersamaan dengan pembuatan peta di bawah
             data_source = 'Default Asset Collection'
         
-        # Create map with classification
-        dasarian_filter = (dasarian, dasarian)
-        my_map = create_map(
-            with_classification=True,
-            dasarian_filter=dasarian_filter
+        # Create map with classification; area statistics untuk default collection
+        # dihitung bersamaan dengan pembuatan peta
+        map_html, default_area_stats = render_map_with_stats(
+            classified_image,
+            compute_stats=source_type != 'custom',
+            dasarian_filter=(dasarian, dasarian)
         )
-        
-        # Convert to HTML
-        map_html = my_map._repr_html_()
+        if source_type != 'custom':
+            area_stats = default_area_stats
         
         dasarian_info = get_dasarian_info(dasarian)
         
@@ -1199,22 +1816,10 @@ def get_classification_map_dasarian():
 def model_info():
     """API endpoint untuk mendapatkan informasi model"""
     try:
-        model = load_trained_model()
-        if model is None:
+        info = get_model_info()
+        if info is None:
             return jsonify({'error': 'Model tidak tersedia'}), 404
         
-        info = {
-            'model_type': str(type(model).__name__),
-            'features': list(model.feature_names_in_),
-            'classes': list(model.classes_),
-            'n_estimators': model.n_estimators,
-            'max_depth': model.max_depth,
-            'min_samples_split': model.min_samples_split,
-            'min_samples_leaf': model.min_samples_leaf,
-            'model_path': config.MODEL_PATH,
-            'bands_used': BANDS_SELECTED
-        }
-        
         return jsonify({
             'success': True,
             'model_info': info
@@ -1235,9 +1840,9 @@ def analyze_phase():
         
         logger.info(f"Analyzing phase with trained model")
         
-        # Cek model
-        model = load_trained_model()
-        if model is None:
+        # Cek model (info model None jika model tidak bisa dimuat)
+        model_info = get_model_info()
+        if model_info is None:
             return jsonify({'error': 'Model tidak tersedia'}), 500
         
         # Lakukan klasifikasi
@@ -1256,22 +1861,23 @@ def analyze_phase():
             return jsonify({'error': 'Gagal melakukan klasifikasi'}), 500
         
         # Get map tiles
-        map_id = classified_image.getMapId(phase_vis_params)
+        map_id = classified_image.getMapId(get_phase_vis_params())
         
         # Get statistics
-        study_area = ee.Geometry.Rectangle([108.1549, -6.5153, 108.5549, -6.1153])
+        study_area = get_analysis_rectangle()
         stats = classified_image.reduceRegion(
             reducer=ee.Reducer.histogram(),
             geometry=study_area,
-            scale=SCALE,
-            maxPixels=1e9
+            scale=get_adaptive_scale(study_area, 'analyze_phase_rectangle'),
+            maxPixels=1e9,
+            tileScale=TILE_SCALE
         ).getInfo()
         
         return jsonify({
             'success': True,
             'stats': stats,
             'period': period_info,
-            'model_classes': list(model.classes_),
+            'model_classes': model_info['classes'],
             'tile_url': map_id['tile_fetcher'].url_format
         })
         
@@ -1340,6 +1946,33 @@ def get_class_statistics():
         logger.error(f"Error getting class statistics: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def compute_period_statistics(period):
+    """Klasifikasi dan hitung statistik area untuk satu periode perbandingan"""
+    dasarian = period.get('dasarian')
+    start_date = period.get('start_date')
+    end_date = period.get('end_date')
+    
+    # Lakukan klasifikasi
+    if start_date and end_date:
+        classified_image = classify_with_date_filter_realtime(start_date, end_date)
+        period_name = f"{start_date} to {end_date}"
+    else:
+        classified_image = classify_with_dasarian_filter_asset(dasarian, dasarian)
+        dasarian_info = get_dasarian_info(dasarian)
+        period_name = dasarian_info['display_name']
+    
+    if classified_image:
+        stats = calculate_area_statistics(classified_image)
+        if stats:
+            return {
+                'period_name': period_name,
+                'dasarian': dasarian,
+                'statistics': stats,
+                'dominant_class': stats['class_distribution'][0] if stats['class_distribution'] else None
+            }
+    
+    return None
+
 @app.route('/api/compare_periods', methods=['POST'])
 @handle_ee_errors
 def compare_periods():
@@ -1351,31 +1984,14 @@ def compare_periods():
         if not periods or len(periods) < 2:
             return jsonify({'error': 'Minimal 2 periode diperlukan untuk perbandingan'}), 400
         
-        comparison_results = []
+        # Bangun classifier sekali sebelum periode diproses paralel
+        create_classifier_from_trained_model()
         
-        for period in periods:
-            dasarian = period.get('dasarian')
-            start_date = period.get('start_date')
-            end_date = period.get('end_date')
-            
-            # Lakukan klasifikasi
-            if start_date and end_date:
-                classified_image = classify_with_date_filter_realtime(start_date, end_date)
-                period_name = f"{start_date} to {end_date}"
-            else:
-                classified_image = classify_with_dasarian_filter_asset(dasarian, dasarian)
-                dasarian_info = get_dasarian_info(dasarian)
-                period_name = dasarian_info['display_name']
-            
-            if classified_image:
-                stats = calculate_area_statistics(classified_image)
-                if stats:
-                    comparison_results.append({
-                        'period_name': period_name,
-                        'dasarian': dasarian,
-                        'statistics': stats,
-                        'dominant_class': stats['class_distribution'][0] if stats['class_distribution'] else None
-                    })
+        # Setiap periode memicu round-trip getInfo yang independen, jalankan bersamaan
+        with ThreadPoolExecutor(max_workers=min(len(periods), MAX_PARALLEL_REQUESTS)) as executor:
+            results = list(executor.map(compute_period_statistics, periods))
+        
+        comparison_results = [result for result in results if result]
         
         return jsonify({
             'success': True,
@@ -1411,16 +2027,17 @@ def collection_info():
         collection = ee.ImageCollection(config.COLLECTION_ASSET)
         collection_with_indices = collection.map(calculate_vegetation_indices).limit(3)
         
-        # Dapatkan informasi dasar
-        total_size = collection.size().getInfo()
-        
-        # Dapatkan sample properties
-        sample_properties = collection_with_indices.first().getInfo().get('properties', {})
+        # Dapatkan informasi dasar dan image pertama dalam satu round-trip
+        # (image utuh, agar properties sama persis dengan first().getInfo())
+        info = ee.Dictionary({
+            'total_size': collection.size(),
+            'first_image': collection_with_indices.first()
+        }).getInfo()
         
         return jsonify({
             'success': True,
-            'total_size': total_size,
-            'sample_properties': sample_properties
+            'total_size': info['total_size'],
+            'sample_properties': info['first_image'].get('properties', {})
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1444,36 +2061,35 @@ def validate_custom_collection():
         try:
             collection = ee.ImageCollection(collection_asset)
             
-            # Get basic info
-            image_count = collection.size().getInfo()
+            # Ambil jumlah image, bands, dan rentang tanggal dalam satu round-trip
+            image_count = collection.size()
+            summary = ee.Dictionary(ee.Algorithms.If(
+                image_count.gt(0),
+                ee.Dictionary({
+                    'image_count': image_count,
+                    'band_names': collection.first().bandNames(),
+                    'first_date': collection.aggregate_min('system:time_start'),
+                    'last_date': collection.aggregate_max('system:time_start')
+                }),
+                ee.Dictionary({'image_count': 0})
+            )).getInfo()
             
+            image_count = summary['image_count']
             if image_count == 0:
                 return jsonify({
                     'success': False,
                     'error': 'Collection kosong atau tidak dapat diakses'
                 }), 400
             
-            # Get first image info
-            first_image = collection.first()
-            first_image_info = first_image.getInfo()
-            
-            # Get bands
-            bands = first_image_info.get('bands', [])
-            band_names = [band.get('id', 'unknown') for band in bands]
+            band_names = summary.get('band_names', [])
             
-            # Get date range - using simple approach
-            try:
-                # Get first and last image dates
-                first_img = collection.sort('system:time_start').first()
-                last_img = collection.sort('system:time_start', False).first()
-                
-                first_date = first_img.get('system:time_start').getInfo()
-                last_date = last_img.get('system:time_start').getInfo()
-                
+            # Fallback if date extraction fails
+            first_date = summary.get('first_date')
+            last_date = summary.get('last_date')
+            if first_date is not None and last_date is not None:
                 min_date = datetime.fromtimestamp(first_date / 1000).strftime('%Y-%m-%d')
                 max_date = datetime.fromtimestamp(last_date / 1000).strftime('%Y-%m-%d')
-            except:
-                # Fallback if date extraction fails
+            else:
                 min_date = "N/A"
                 max_date = "N/A"
             
@@ -1601,21 +2217,32 @@ def get_custom_collection_data(collection_asset, collection_type, start_date=Non
             collection = collection.filterBounds(aoi)
             logger.info(f"Filtered by AOI")
         
-        # Log jumlah image setelah filter
+        # Log jumlah image setelah filter; band image pertama (untuk sentinel1)
+        # ikut diambil dalam request yang sama
+        collection_summary = {'count': collection.size()}
+        if collection_type == 'sentinel1':
+            collection_summary['first_bands'] = ee.Algorithms.If(
+                collection.size().gt(0),
+                collection.first().bandNames(),
+                ee.List([])
+            )
         try:
-            count = collection.size().getInfo()
+            summary = ee.Dictionary(collection_summary).getInfo()
+            count = summary['count']
             logger.info(f"Custom collection image count after filter: {count}")
             if count == 0:
                 logger.error("Custom collection kosong setelah filter!")
         except Exception as e:
+            summary = None
             logger.error(f"Tidak bisa mendapatkan jumlah image: {str(e)}")
         
         # Process based on collection type
         if collection_type == 'sentinel1':
             # Check if collection already has processed bands
             try:
-                first_img = collection.first()
-                first_bands = first_img.bandNames().getInfo()
+                if summary is None:
+                    raise RuntimeError("Band image pertama tidak tersedia")
+                first_bands = summary['first_bands']
                 logger.info(f"First image bands: {first_bands}")
                 
                 # Check if collection already has required indices
@@ -1674,10 +2301,10 @@ def classify_with_custom_collection(collection_asset, collection_type, dasarian_
         # Create composite
         if dasarian_start and dasarian_end:
             # For dasarian-based classification
-            composite = collection.median()
+            composite = median_composite(collection)
         else:
             # For date-based classification
-            composite = collection.median()
+            composite = median_composite(collection)
         logger.info("Composite (median) created from custom collection")
         
         # Ensure required bands for classification
@@ -1734,6 +2361,82 @@ def classify_with_custom_collection(collection_asset, collection_type, dasarian_
         logger.error(f"Error in classify_with_custom_collection: {str(e)}")
         raise
 
+def export_classified_collection():
+    """
+    Klasifikasi setiap image COLLECTION_ASSET dengan classifier model saat ini lalu ekspor
+    ke CLASSIFIED_COLLECTION_ASSET, sehingga klasifikasi dasarian cukup dibaca dari asset
+    Setiap image diberi property model_cache_key dan dasarian_index (1-based)
+    Mengembalikan daftar task export yang sudah dimulai
+    """
+    asset_root = config.CLASSIFIED_COLLECTION_ASSET
+    if not asset_root:
+        raise ValueError("CLASSIFIED_COLLECTION_ASSET is missing in the environment variables.")
+
+    classifier, model_key = get_classifier_with_key()
+    if classifier is None:
+        raise RuntimeError("Classifier tidak tersedia")
+
+    if ee.data.getInfo(asset_root) is None:
+        logger.info(f"Creating ImageCollection asset {asset_root}")
+        ee.data.createAsset({'type': 'ImageCollection'}, asset_root)
+
+    collection = ee.ImageCollection(config.COLLECTION_ASSET)
+    total_images = collection.size().getInfo()
+    collection_list = collection.toList(total_images)
+    exported_indices = get_classified_asset_indices(model_key)
+    aoi = get_indramayu_aoi()
+    
+    # Export di CRS asli collection dengan skala SCALE, sehingga worker export tidak perlu
+    # memproyeksikan ulang tile (tanpa reproject() di graph)
+    export_crs = ee.Image(collection_list.get(0)).select(BANDS_SELECTED[0]).projection().crs().getInfo()
+    logger.info(f"Exporting classified images in {export_crs} at {SCALE} m")
+
+    pending_tasks = []
+    for dasarian in range(1, total_images + 1):
+        if dasarian in exported_indices:
+            logger.info(f"Dasarian {dasarian} already exported for model {model_key}, skipping")
+            continue
+
+        classified = ee.Image(collection_list.get(dasarian - 1)) \
+            .select(BANDS_SELECTED) \
+            .classify(classifier) \
+            .toByte() \
+            .set({'model_cache_key': model_key, 'dasarian_index': dasarian})
+
+        task = ee.batch.Export.image.toAsset(
+            image=classified,
+            description=f"classified_d{dasarian:02d}_{model_key}",
+            assetId=f"{asset_root}/d{dasarian:02d}_{model_key}",
+            region=aoi,
+            crs=export_crs,
+            scale=SCALE,
+            # Band kelas kategorikal: piramida pakai modus, bukan rata-rata kode kelas
+            pyramidingPolicy={'classification': 'mode'},
+            maxPixels=1e13
+        )
+        pending_tasks.append((dasarian, task))
+
+    # Setiap task.start() adalah satu request HTTP ke EE, jadi dimulai paralel
+    # dengan batas thread yang sama seperti request EE lain (MAX_PARALLEL_REQUESTS)
+    def start_export(dasarian_task):
+        dasarian, task = dasarian_task
+        task.start()
+        logger.info(f"Started export for dasarian {dasarian} (task id: {task.id})")
+        return task
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS) as executor:
+        tasks = list(executor.map(start_export, pending_tasks))
+
+    # Index baru terlihat setelah task selesai; baca ulang asset pada pemanggilan berikutnya
+    _classified_asset_indices.pop(model_key, None)
+    return tasks
+
+@app.cli.command('export-classified')
+def export_classified_command():
+    """Ekspor hasil klasifikasi seluruh dasarian ke CLASSIFIED_COLLECTION_ASSET"""
+    tasks = export_classified_collection()
+    logger.info(f"Started {len(tasks)} classified image export task(s)")
+
 if __name__ == '__main__':
     # Menjalankan server di port yang diinginkan
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
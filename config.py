@@ -12,6 +12,9 @@ class Config:
     if not GEE_PROJECT_ID:
         raise ValueError("GEE_PROJECT_ID is missing in the environment variables.")
     
+    # Endpoint high-volume EE untuk banyak request paralel (opt-in; endpoint ini tanpa caching)
+    GEE_HIGH_VOLUME = os.getenv('GEE_HIGH_VOLUME', 'false').lower() == 'true'
+    
     # Model Configuration  
     MODEL_PATH = os.getenv('MODEL_PATH')
     if not MODEL_PATH:
@@ -30,6 +33,16 @@ class Config:
     if not COLLECTION_ASSET:
         raise ValueError("COLLECTION_ASSET is missing in the environment variables.")
     
+    # Prefix asset classifier EE hasil Export.classifier.toAsset (optional, kosong = tidak dipakai)
+    # Asset id lengkap: <CLASSIFIER_ASSET>_<cache key model>
+    CLASSIFIER_ASSET = os.getenv('CLASSIFIER_ASSET', '')
+    
+    # Table asset sampel pelatihan untuk training fallback EE (optional, diekspor otomatis jika belum ada)
+    TRAINING_SAMPLES_ASSET = os.getenv('TRAINING_SAMPLES_ASSET', '')
+    
+    # ImageCollection asset hasil klasifikasi per dasarian (optional, diisi dengan `flask export-classified`)
+    CLASSIFIED_COLLECTION_ASSET = os.getenv('CLASSIFIED_COLLECTION_ASSET', '')
+    
     # Processing Parameters
     SCALE = int(os.getenv('SCALE'))
     if not SCALE:
@@ -39,6 +52,18 @@ class Config:
     if not MAX_TRAINING_POINTS:
         raise ValueError("MAX_TRAINING_POINTS is missing in the environment variables.")
     
+    # Target jumlah pixel untuk reduceRegion statistik area; skala dinaikkan otomatis dari SCALE
+    STATS_TARGET_PIXELS = float(os.getenv('STATS_TARGET_PIXELS', '1e7'))
+    
+    # parallelScale untuk reducer komposit median (naikkan jika EE kehabisan memori)
+    PARALLEL_SCALE = int(os.getenv('PARALLEL_SCALE', '4'))
+    
+    # tileScale untuk reduceRegion statistik (naikkan jika EE kehabisan memori)
+    TILE_SCALE = float(os.getenv('TILE_SCALE', '4'))
+    
+    # Bangun ulang classifier EE setiap request (abaikan cache classifier)
+    FORCE_RETRAIN = os.getenv('FORCE_RETRAIN', 'false').lower() == 'true'
+    
     # Flask Configuration (optional)
     FLASK_ENV = os.getenv('FLASK_ENV')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
@@ -0,0 +1,77 @@
+"""
+Test serialisasi pohon sklearn ke format decision tree EE (tree_to_ee_string di app.py)
+
+Fungsi diambil langsung dari source app.py agar test tidak perlu mengimpor app
+(import app menginisialisasi Earth Engine dan memuat model saat startup).
+String pohon di-parse dengan walker rpart sederhana, lalu prediksinya dibandingkan dengan sklearn.
+"""
+import ast
+import os
+import re
+
+import numpy as np
+import pytest
+
+sklearn_tree = pytest.importorskip('sklearn.tree')
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# "n) fitur <= threshold n_samples impurity kelas", leaf diakhiri " *"
+NODE_PATTERN = re.compile(r'^\s*(\d+)\) (\S+) (<=|>) (\S+) (\d+) (\S+) (\S+)( \*)?$')
+
+
+def load_tree_to_ee_string():
+    """Ambil fungsi tree_to_ee_string dari app.py tanpa menjalankan kode startup app"""
+    with open(APP_PATH, 'r', encoding='utf-8') as f:
+        module = ast.parse(f.read())
+    func = next(node for node in module.body
+                if isinstance(node, ast.FunctionDef) and node.name == 'tree_to_ee_string')
+    namespace = {}
+    exec(compile(ast.Module(body=[func], type_ignores=[]), APP_PATH, 'exec'), namespace)
+    return namespace['tree_to_ee_string']
+
+
+def parse_ee_tree(tree_string):
+    """Parse string pohon EE: nomor node -> (fitur, threshold, kelas, leaf)"""
+    lines = tree_string.split('\n')
+    assert lines[0].startswith('1) root ')
+
+    nodes = {}
+    for line in lines[1:]:
+        match = NODE_PATTERN.match(line)
+        assert match, f"Baris pohon tidak valid: {line!r}"
+        number, feature, _, threshold, _, _, value, leaf = match.groups()
+        nodes[int(number)] = (feature, float(threshold), int(value), leaf is not None)
+    return nodes
+
+
+def predict_ee_tree(nodes, sample):
+    """Walker referensi rpart: anak kiri 2n (fitur <= threshold), anak kanan 2n+1"""
+    number = 1
+    while True:
+        feature, threshold, _, _ = nodes[2 * number]
+        number = 2 * number if sample[feature] <= threshold else 2 * number + 1
+        _, _, value, is_leaf = nodes[number]
+        if is_leaf:
+            return value
+
+
+@pytest.mark.parametrize('max_depth', [1, 3, None])
+def test_tree_to_ee_string_matches_sklearn_predictions(max_depth):
+    rng = np.random.RandomState(0)
+    feature_names = ['VH', 'VV', 'VH_VV']
+    # Nilai float32 agar perbandingan threshold sama dengan sklearn (yang membandingkan di float32)
+    X = rng.uniform(-25, 0, size=(200, len(feature_names))).astype(np.float32)
+    y = np.array(['vegetatif 1', 'vegetatif 2', 'generatif 1', 'generatif 2'])[
+        (X[:, 0] > -12).astype(int) + 2 * (X[:, 1] - X[:, 2] > 0).astype(int)
+    ]
+
+    estimator = sklearn_tree.DecisionTreeClassifier(max_depth=max_depth, random_state=0).fit(X, y)
+    class_codes = np.arange(len(estimator.classes_)) + 10
+
+    tree_to_ee_string = load_tree_to_ee_string()
+    nodes = parse_ee_tree(tree_to_ee_string(estimator, feature_names, class_codes))
+
+    expected = class_codes[np.searchsorted(estimator.classes_, estimator.predict(X))]
+    actual = [predict_ee_tree(nodes, dict(zip(feature_names, row.astype(float)))) for row in X]
+    assert actual == expected.tolist()